@@ -0,0 +1,60 @@
+"""提醒索引内存基准
+
+对比 ReminderIndex 与 query_reminders 返回的 SQLite 行元组列表在 N 条待触发提醒下的内存占用。
+用法：python bench_memory.py [条数]
+"""
+import sys
+import time
+import tracemalloc
+
+from reminder_index import REMINDER_TYPES, ReminderIndex
+
+USERS = 50000
+CHATS = 5000
+
+
+def build_rows(count: int):
+    base = time.time()
+    for i in range(count):
+        reminder_type = REMINDER_TYPES[i % len(REMINDER_TYPES)]
+        yield (i + 1, f"提醒我喝水 第{i}条", reminder_type, "08:00", f"{i % CHATS}@chatroom", f"wxid_{i % USERS:08d}", base + (i * 7919) % 86400)
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    def build_tuples():
+        return [row[:5] for row in build_rows(count)]
+
+    def build_index():
+        index = ReminderIndex()
+        for id, _, reminder_type, _, chat_id, wxid, fire_at in build_rows(count):
+            index.append(id, fire_at, reminder_type, wxid, chat_id)
+        index.sort()
+        return index
+
+    _, tuple_bytes, tuple_peak, tuple_time = measure(build_tuples)
+    index, index_bytes, index_peak, index_time = measure(build_index)
+
+    print(f"提醒条数: {count}")
+    print(f"行元组列表: {tuple_bytes / 2**20:8.1f} MiB  ({tuple_bytes / count:6.1f} B/条, 峰值 {tuple_peak / 2**20:.1f} MiB, {tuple_time:.2f}s)")
+    print(f"ReminderIndex: {index_bytes / 2**20:8.1f} MiB  ({index_bytes / count:6.1f} B/条, 峰值 {index_peak / 2**20:.1f} MiB, {index_time:.2f}s)")
+    print(f"  其中并行数组: {index.nbytes() / 2**20:.1f} MiB")
+
+    start = time.perf_counter()
+    due = index.pop_due(time.time() + 30)
+    print(f"pop_due 取出 {len(due)} 条耗时 {(time.perf_counter() - start) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
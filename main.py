@@ -1,7 +1,11 @@
 import asyncio
+import cProfile
+import contextlib
+import functools
 import re
+import zlib
 import tomllib
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from loguru import logger
 from WechatAPI import WechatAPIClient
@@ -14,6 +18,64 @@ from datetime import datetime, timedelta
 from dateutil import parser
 import time
 from utils.event_manager import EventManager
+from plugins.Reminder.reminder_index import PRIORITY_EXACT, PRIORITY_SPREAD, ReminderIndex, load_reminder
+from plugins.Reminder.reminder_stats import ReminderStats
+from plugins.Reminder.reminder_quota import RECURRING_INTERVAL_MINUTES, RateLimiter
+from plugins.Reminder.reminder_backup import backup_databases, commit_restore, list_backups, rotate_backups, stage_restore
+
+# 提醒内容全文索引，trigram 分词支持中文子串匹配；触发器保证与 reminders 表同步
+FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS reminders_fts USING fts5(
+        content, content='reminders', content_rowid='id', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS reminders_fts_insert AFTER INSERT ON reminders BEGIN
+        INSERT INTO reminders_fts(rowid, content) VALUES (new.id, new.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS reminders_fts_delete AFTER DELETE ON reminders BEGIN
+        INSERT INTO reminders_fts(reminders_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS reminders_fts_update AFTER UPDATE OF content ON reminders BEGIN
+        INSERT INTO reminders_fts(reminders_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO reminders_fts(rowid, content) VALUES (new.id, new.content);
+    END;
+"""
+
+RECURRING_TYPES = ("daily", "weekly", "monthly", "yearly", "every_hour", "every_day", "every_week")
+
+
+def timed(phase: str):
+    """入口计时装饰器，未开启性能监控时直接调用原函数"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            if not self.profile_enable:
+                return await func(self, *args, **kwargs)
+            with self._slow(phase):
+                return await func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class _SlowTimer:
+    """记录一段操作的耗时，超过阈值时写入慢日志"""
+    __slots__ = ("plugin", "phase", "wxid", "reminder_id", "start")
+
+    def __init__(self, plugin, phase: str, wxid: str = None, reminder_id: int = None):
+        self.plugin = plugin
+        self.phase = phase
+        self.wxid = wxid
+        self.reminder_id = reminder_id
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.plugin._record_timing(self.phase, time.perf_counter() - self.start, self.wxid, self.reminder_id)
+        return False
 
 
 class Reminder(PluginBase):
@@ -43,21 +105,86 @@ class Reminder(PluginBase):
         self.simple_reminder_template = plugin_config.get("simple_reminder_template",
                                                      "⏰ 定时提醒 ⏰\n\n{content}\n\n⏱️ {time}")
 
+        # 性能监控，默认关闭；关闭时计时点几乎没有额外开销
+        self.profile_enable = plugin_config.get("profile_enable", False)
+        self.slow_threshold = plugin_config.get("slow_threshold_ms", 500) / 1000
+        self.timing_stats = {}  # phase -> [次数, 总耗时, 最大耗时]
+        self.profile_ticks_left = 0
+        self.profiler = None
+
         self.db = XYBotDB()
         self.processed_message_ids = set()
         self.data_dir = "reminder_data"
         os.makedirs(self.data_dir, exist_ok=True)
 
+        # 待触发提醒的紧凑内存索引，首次检查时从各用户数据库加载
+        self.index = ReminderIndex()
+        self.index_loaded = False
+        # 上次检查中出错的提醒，下次检查时优先重试
+        self.retry_queue = []
+        # 模拟用户消息的提醒在该窗口内错开触发，避免同一时刻大量请求涌向其他插件
+        self.jitter_window = plugin_config.get("jitter_window_seconds", 0)
+        self.stats = ReminderStats(self.data_dir)
+        self.prepared_dbs = set()
+        self.fts_unavailable = set()  # 不支持全文索引的数据库，搜索直接使用 LIKE 查询
+
         self.store_command = "记录"
         self.query_command = ["我的记录"]
         self.delete_command = "删除"
         self.help_command = "记录帮助"
+        self.search_command = "搜索"
+        self.search_limit = plugin_config.get("search_limit", 10)
+        self.max_batch_size = plugin_config.get("max_batch_size", 20)
+
+        # 在线备份，每天 backup_hour 点执行一次，保留最近 backup_keep 份
+        self.backup_enable = plugin_config.get("backup_enable", False)
+        self.backup_hour = plugin_config.get("backup_hour", 4)
+        self.backup_keep = plugin_config.get("backup_keep", 7)
+        self.backup_pages = plugin_config.get("backup_pages_per_step", 64)
+        self.backup_sleep = plugin_config.get("backup_step_sleep_ms", 10) / 1000
+        self.backup_dir = plugin_config.get("backup_dir", "reminder_backups")
+        self.backup_lock = asyncio.Lock()
+
+        # 配额限制，0 表示不限制；管理员不受限制
+        self.max_reminders_per_user = plugin_config.get("max_reminders_per_user", 0)
+        self.max_reminders_per_chat = plugin_config.get("max_reminders_per_chat", 0)
+        self.min_recurring_interval = plugin_config.get("min_recurring_interval_minutes", 0)
+        self.create_limiter = RateLimiter(plugin_config.get("create_rate_burst", 0),
+                                          plugin_config.get("create_rate_per_minute", 0))
+        # 批量创建按条数消耗令牌，超过令牌桶容量的批量永远无法通过
+        if self.create_limiter.enabled and self.max_batch_size > self.create_limiter.capacity:
+            logger.warning(f"max_batch_size={self.max_batch_size} 大于 create_rate_burst={self.create_limiter.capacity}，"
+                           f"非管理员的批量创建上限按 {self.create_limiter.capacity} 条处理")
+        self.profile_command = "记录性能"
+        self.stats_command = "记录统计"
+        self.backup_command = "记录备份"
+        self.restore_command = "记录恢复"
+        self.profile_dir = os.path.join(self.data_dir, "profiles")
+
+    def _slow(self, phase: str, wxid: str = None, reminder_id: int = None):
+        if not self.profile_enable:
+            return _NULL_TIMER
+        return _SlowTimer(self, phase, wxid, reminder_id)
+
+    def _record_timing(self, phase: str, elapsed: float, wxid: str = None, reminder_id: int = None):
+        stats = self.timing_stats.get(phase)
+        if stats is None:
+            stats = self.timing_stats[phase] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        if elapsed >= self.slow_threshold:
+            logger.warning(f"[慢操作] phase={phase} 耗时={elapsed * 1000:.1f}ms wxid={wxid} reminder_id={reminder_id}")
 
     def get_db_path(self, wxid: str) -> str:
         db_name = f"user_{wxid}.db"
         return os.path.join(self.data_dir, db_name)
 
     def create_table(self, db_path: str):
+        # 同一个数据库只需要建表一次
+        if db_path in self.prepared_dbs:
+            return
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         try:
@@ -75,14 +202,83 @@ class Reminder(PluginBase):
             conn.commit()
         except sqlite3.Error as e:
             logger.exception(f"创建数据库表失败: {e}")
+            conn.close()
+            return
+
+        # 全文索引创建失败（如 SQLite 不支持 FTS5）时不影响存储，搜索会退回 LIKE 查询
+        try:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reminders_fts'")
+            fts_exists = cursor.fetchone() is not None
+            if not fts_exists:
+                cursor.executescript(FTS_SCHEMA)
+                cursor.execute("INSERT INTO reminders_fts(reminders_fts) VALUES ('rebuild')")
+                conn.commit()
+            self.fts_unavailable.discard(db_path)
+        except sqlite3.Error as e:
+            logger.warning(f"创建全文索引失败，搜索将使用普通查询: {e}")
+            self.fts_unavailable.add(db_path)
         finally:
             conn.close()
+        self.prepared_dbs.add(db_path)
 
     async def store_reminder(self, wxid: str, content: str, reminder_type: str, reminder_time: str, chat_id: str) -> Optional[int]:
         db_path = self.get_db_path(wxid)
         self.create_table(db_path)
+        reminder_type, reminder_time = self._normalize_reminder_time(reminder_type, reminder_time)
+
+        try:
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            with self._slow("sqlite.store", wxid):
+                cursor.execute("INSERT INTO reminders (wxid, content, reminder_type, reminder_time, chat_id) VALUES (?, ?, ?, ?, ?)",
+                               (wxid, content, reminder_type, reminder_time, chat_id))
+                new_id = cursor.lastrowid
+                conn.commit()
+            logger.info(f"用户 {wxid} 存储备忘录成功: {content}, {reminder_type}, {reminder_time}, chat_id={chat_id}")
+            await self._index_reminder(new_id, reminder_type, reminder_time, wxid, chat_id, self._reminder_priority(content))
+            self.stats.record_store(wxid, [(reminder_type, chat_id)])
+            return new_id
+        except sqlite3.Error as e:
+            logger.exception(f"存储备忘录失败: {e}")
+            return None
+        finally:
+            conn.close()
+
+    async def store_reminders(self, wxid: str, chat_id: str, entries: List[Tuple[str, str, str]]) -> Optional[List[int]]:
+        """在一个事务中批量存储 (content, reminder_type, reminder_time)，返回新记录ID列表"""
+        db_path = self.get_db_path(wxid)
+        self.create_table(db_path)
+        rows = []
+        for content, reminder_type, reminder_time in entries:
+            reminder_type, reminder_time = self._normalize_reminder_time(reminder_type, reminder_time)
+            rows.append((wxid, content, reminder_type, reminder_time, chat_id))
 
-        # 如果是相对时间类型，计算绝对时间并转换为 one_time
+        conn = sqlite3.connect(db_path)
+        try:
+            with self._slow("sqlite.store_batch", wxid):
+                with conn:
+                    conn.executemany("INSERT INTO reminders (wxid, content, reminder_type, reminder_time, chat_id) VALUES (?, ?, ?, ?, ?)", rows)
+                    # 同一事务内自增ID连续分配
+                    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.exception(f"批量存储备忘录失败: {e}")
+            return None
+        finally:
+            conn.close()
+
+        new_ids = list(range(last_id - len(rows) + 1, last_id + 1))
+        logger.info(f"用户 {wxid} 批量存储备忘录成功: {len(rows)} 条, chat_id={chat_id}")
+        indexed = []
+        for new_id, (_, content, reminder_type, reminder_time, _) in zip(new_ids, rows):
+            await self._index_reminder(new_id, reminder_type, reminder_time, wxid, chat_id, self._reminder_priority(content),
+                                       batch=indexed)
+        self.index.merge(indexed)
+        self.stats.record_store(wxid, [(reminder_type, chat_id) for _, _, reminder_type, _, _ in rows])
+        return new_ids
+
+    @staticmethod
+    def _normalize_reminder_time(reminder_type: str, reminder_time: str) -> Tuple[str, str]:
+        """相对时间类型换算成绝对时间并转换为 one_time"""
         if reminder_type in ["minutes_later", "hours_later", "days_later"]:
             now = datetime.now()
             if reminder_type == "minutes_later":
@@ -96,40 +292,68 @@ class Reminder(PluginBase):
                 absolute_time = now + timedelta(days=days)
             reminder_time = absolute_time.strftime('%Y-%m-%d %H:%M:%S')
             reminder_type = "one_time"
+        return reminder_type, reminder_time
 
+    async def query_reminders(self, wxid: str) -> List[tuple]:
+        db_path = self.get_db_path(wxid)
+        if not os.path.exists(db_path):
+            return []
         try:
             conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
-            cursor.execute("INSERT INTO reminders (wxid, content, reminder_type, reminder_time, chat_id) VALUES (?, ?, ?, ?, ?)",
-                           (wxid, content, reminder_type, reminder_time, chat_id))
-            new_id = cursor.lastrowid
-            conn.commit()
-            logger.info(f"用户 {wxid} 存储备忘录成功: {content}, {reminder_type}, {reminder_time}, chat_id={chat_id}")
-            return new_id
+            with self._slow("sqlite.query", wxid):
+                cursor.execute("SELECT id, content, reminder_type, reminder_time, chat_id FROM reminders WHERE wxid = ? AND is_done = 0", (wxid,))
+                results = cursor.fetchall()
+            conn.close()
+            return results
         except sqlite3.Error as e:
-            logger.exception(f"存储备忘录失败: {e}")
-            return None
+            logger.exception(f"查询用户 {wxid} 的备忘录失败: {e}")
+            return []
         finally:
             conn.close()
 
-    async def query_reminders(self, wxid: str) -> List[tuple]:
+    async def search_reminders(self, wxid: str, keyword: str, limit: int) -> List[tuple]:
         db_path = self.get_db_path(wxid)
         if not os.path.exists(db_path):
             return []
+        # 升级前创建的数据库没有全文索引，首次搜索时补建
+        self.create_table(db_path)
+        terms = keyword.split()
+        columns = "r.id, r.content, r.reminder_type, r.reminder_time, r.chat_id"
+        conn = sqlite3.connect(db_path)
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, content, reminder_type, reminder_time, chat_id FROM reminders WHERE wxid = ? AND is_done = 0", (wxid,))
-            results = cursor.fetchall()
-            conn.close()
-            return results
+            with self._slow("sqlite.search", wxid):
+                # trigram 索引只能匹配 3 个字符及以上的词，更短的词直接在 SQLite 中 LIKE 过滤
+                if db_path not in self.fts_unavailable and all(len(term) >= 3 for term in terms):
+                    try:
+                        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+                        return conn.execute(
+                            f"SELECT {columns} FROM reminders_fts JOIN reminders r ON r.id = reminders_fts.rowid "
+                            "WHERE reminders_fts MATCH ? AND r.wxid = ? AND r.is_done = 0 ORDER BY rank LIMIT ?",
+                            (match, wxid, limit)).fetchall()
+                    except sqlite3.OperationalError as e:
+                        # 只有建索引失败才标记为不可用，这里只退回本次查询
+                        logger.warning(f"用户 {wxid} 的全文索引查询失败，改用普通查询: {e}")
+                conditions = " AND ".join("r.content LIKE ? ESCAPE '\\'" for _ in terms)
+                patterns = ["%" + re.sub(r"([%_\\])", r"\\\1", term) + "%" for term in terms]
+                return conn.execute(
+                    f"SELECT {columns} FROM reminders r WHERE r.wxid = ? AND r.is_done = 0 AND {conditions} "
+                    "ORDER BY instr(r.content, ?), r.id LIMIT ?",
+                    (wxid, *patterns, terms[0], limit)).fetchall()
         except sqlite3.Error as e:
-            logger.exception(f"查询用户 {wxid} 的备忘录失败: {e}")
+            logger.exception(f"搜索用户 {wxid} 的备忘录失败: {e}")
             return []
         finally:
             conn.close()
 
     async def delete_reminder(self, wxid: str, reminder_id: int) -> bool:
+        if not await self._delete_reminder_row(wxid, reminder_id):
+            return False
+        self.index.remove(wxid, reminder_id)
+        return True
+
+    async def _delete_reminder_row(self, wxid: str, reminder_id: int) -> bool:
+        """只删除数据库记录并更新统计；已从索引中取出的提醒（如刚触发的一次性提醒）直接调用"""
         db_path = self.get_db_path(wxid)
         if not os.path.exists(db_path):
             logger.warning(f"用户 {wxid} 的数据库不存在")
@@ -137,8 +361,12 @@ class Reminder(PluginBase):
         try:
             conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM reminders WHERE id = ? AND wxid = ?", (reminder_id, wxid))
-            conn.commit()
+            with self._slow("sqlite.delete", wxid, reminder_id):
+                cursor.execute("SELECT reminder_type, chat_id FROM reminders WHERE id = ? AND wxid = ?", (reminder_id, wxid))
+                deleted = cursor.fetchall()
+                cursor.execute("DELETE FROM reminders WHERE id = ? AND wxid = ?", (reminder_id, wxid))
+                conn.commit()
+            self.stats.record_delete(wxid, deleted)
             logger.info(f"删除备忘录 {reminder_id} 成功")
             return True
         except sqlite3.Error as e:
@@ -155,8 +383,12 @@ class Reminder(PluginBase):
         try:
             conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
+            cursor.execute("SELECT reminder_type, chat_id FROM reminders WHERE wxid = ? AND is_done = 0", (wxid,))
+            deleted = cursor.fetchall()
             cursor.execute("DELETE FROM reminders WHERE wxid = ?", (wxid,))
             conn.commit()
+            self.index.remove_owner(wxid)
+            self.stats.record_delete(wxid, deleted)
             logger.info(f"删除用户 {wxid} 的所有备忘录成功")
             return True
         except sqlite3.Error as e:
@@ -166,6 +398,7 @@ class Reminder(PluginBase):
             conn.close()
 
     @on_text_message(priority=90)
+    @timed("handle_text")
     async def handle_text(self, bot: WechatAPIClient, message: dict):
         wxid = message["SenderWxid"]
         content = message["Content"].strip()
@@ -176,6 +409,25 @@ class Reminder(PluginBase):
         if not self.enable:
             return True
 
+        if content.startswith(self.profile_command) and wxid in self.admins:
+            at_list = [wxid] if is_group_chat else None
+            await self._send_message(bot, chat_id, self._handle_profile_command(content), at_list)
+            return False
+
+        if content == self.stats_command and wxid in self.admins:
+            at_list = [wxid] if is_group_chat else None
+            await self._send_message(bot, chat_id, self._format_stats(), at_list)
+            return False
+
+        if wxid in self.admins and (content == self.backup_command or content.startswith(self.restore_command)):
+            at_list = [wxid] if is_group_chat else None
+            if content == self.backup_command:
+                output = await self._handle_backup_command()
+            else:
+                output = await self._handle_restore_command(content[len(self.restore_command):].strip())
+            await self._send_message(bot, chat_id, output, at_list)
+            return False
+
         if content == self.store_command or (content.startswith(self.store_command) and len(content.strip()) == len(self.store_command)):
             help_message = (
                 "📝-----XXXBOT-----📝\n"
@@ -193,11 +445,14 @@ class Reminder(PluginBase):
                 " - 记录 每天 12:00 天气 北京\n"
                 " - 记录 每周一 09:00 新闻\n"
                 " - 记录 30分钟后 提醒我喝水\n\n"
+                "📚批量创建:\n"
+                " - 记录 后换行，每行一条 [时间/周期] [内容]\n\n"
                 "🔄插件联动功能:\n"
                 " - 如果提醒内容以\"提醒\"开头，将作为简单提醒发送\n"
                 " - 其他提醒内容将模拟用户发送消息，可触发任何插件或AI回复\n\n"
                 "📋管理记录:\n"
                 " - 我的记录 (查看所有记录)\n"
+                " - 搜索 关键词 (搜索记录)\n"
                 " - 删除 序号 (取消单个记录)\n"
                 " - 删除 全部 (取消所有记录)"
             )
@@ -213,6 +468,10 @@ class Reminder(PluginBase):
         elif content.startswith(self.store_command):
             try:
                 info = content[len(self.store_command):].strip()
+                lines = [line.strip() for line in info.splitlines() if line.strip()]
+                if len(lines) > 1:
+                    return await self._handle_batch_store(bot, message, lines)
+
                 parts = info.split(maxsplit=2)
                 if len(parts) < 2:
                     error_msg = "\n参数错误！请使用：记录 [时间/周期] [内容]"
@@ -223,144 +482,17 @@ class Reminder(PluginBase):
                 time_period_str = parts[0]
                 reminder_content = parts[1]
 
-                reminder_type = None
-                reminder_time = None
-                next_time = None
-
-                if "分钟后" in time_period_str:
-                    reminder_type = "minutes_later"
-                    reminder_time = time_period_str
-                    now = datetime.now()
-                    minutes = int(reminder_time.replace("分钟后", ""))
-                    next_time = now + timedelta(minutes=minutes)
-                elif "小时后" in time_period_str:
-                    reminder_type = "hours_later"
-                    reminder_time = time_period_str
-                    now = datetime.now()
-                    hours = int(reminder_time.replace("小时后", ""))
-                    next_time = now + timedelta(hours=hours)
-                elif "天后" in time_period_str:
-                    reminder_type = "days_later"
-                    reminder_time = time_period_str
-                    now = datetime.now()
-                    days = int(reminder_time.replace("天后", ""))
-                    next_time = now + timedelta(days=days)
-                elif "今天" in time_period_str:
-                    reminder_type = "one_time"
-                    now = datetime.now()
-                    # 提取时间部分，格式如"今天 12:30"
-                    time_match = re.search(r'今天\s*(\d{1,2}:\d{2})', time_period_str)
-                    if time_match:
-                        time_str = time_match.group(1)
-                        hour, minute = map(int, time_str.split(':'))
-                        next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                        # 如果时间已经过去，则设置为明天
-                        if next_time < now:
-                            error_msg = "\n指定的时间已经过去，请重新设置"
-                            at_list = [wxid] if is_group_chat else None
-                            await self._send_message(bot, chat_id, error_msg, at_list)
-                            return False
-                        reminder_time = next_time.strftime('%Y-%m-%d %H:%M:%S')
-                    else:
-                        error_msg = "\n时间格式错误！请使用：今天 HH:MM 格式"
-                        if is_group_chat:
-                            await bot.send_at_message(chat_id, error_msg, [wxid])
-                        else:
-                            await bot.send_text_message(chat_id, error_msg)
-                        return False
-                elif "明天" in time_period_str:
-                    reminder_type = "one_time"
-                    now = datetime.now()
-                    # 提取时间部分，格式如"明天 12:30"
-                    time_match = re.search(r'明天\s*(\d{1,2}:\d{2})', time_period_str)
-                    if time_match:
-                        time_str = time_match.group(1)
-                        hour, minute = map(int, time_str.split(':'))
-                        next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(days=1)
-                        reminder_time = next_time.strftime('%Y-%m-%d %H:%M:%S')
-                    else:
-                        error_msg = "\n时间格式错误！请使用：明天 HH:MM 格式"
-                        at_list = [wxid] if is_group_chat else None
-                        await self._send_message(bot, chat_id, error_msg, at_list)
-                        return False
-                elif "后天" in time_period_str:
-                    reminder_type = "one_time"
-                    now = datetime.now()
-                    # 提取时间部分，格式如"后天 12:30"
-                    time_match = re.search(r'后天\s*(\d{1,2}:\d{2})', time_period_str)
-                    if time_match:
-                        time_str = time_match.group(1)
-                        hour, minute = map(int, time_str.split(':'))
-                        next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(days=2)
-                        reminder_time = next_time.strftime('%Y-%m-%d %H:%M:%S')
-                    else:
-                        error_msg = "\n时间格式错误！请使用：后天 HH:MM 格式"
-                        at_list = [wxid] if is_group_chat else None
-                        await self._send_message(bot, chat_id, error_msg, at_list)
-                        return False
-                elif re.match(r"^\d{2}:\d{2}$", time_period_str):
-                    reminder_type = "daily"
-                    reminder_time = time_period_str
-                    next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-                elif "每年" in time_period_str:
-                    reminder_type = "yearly"
-                    reminder_time = time_period_str.replace("每年", "")
-                    next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-                elif "每月" in time_period_str:
-                    reminder_type = "monthly"
-                    reminder_time = time_period_str.replace("每月", "")
-                    next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-                elif "每周" in time_period_str:
-                    reminder_type = "weekly"
-                    day_mapping = {"一": "1", "二": "2", "三": "3", "四": "4", "五": "5", "六": "6", "日": "7"}
-                    match = re.match(r"每周([一二三四五六日])\s*(\d{1,2}:\d{2})", time_period_str)
-                    if match:
-                        weekday = day_mapping[match.group(1)]
-                        time_str = match.group(2)
-                        reminder_time = f"{weekday} {time_str}"
-                        next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-                    else:
-                        error_msg = "\n格式错误，请使用：每周一 9:00"
-                        if is_group_chat:
-                            await bot.send_at_message(chat_id, error_msg, [wxid])
-                        else:
-                            await bot.send_text_message(chat_id, error_msg)
-                        return False
-                elif time_period_str.startswith("每天"):
-                    reminder_type = "every_day"
-                    # 提取时间部分
-                    time_match = re.search(r'每天\s*(\d{1,2}:\d{2})', time_period_str)
-                    if time_match:
-                        reminder_time = time_match.group(1)
-                        next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-                    else:
-                        error_msg = "\n时间格式错误！请使用：每天 HH:MM 格式"
-                        if is_group_chat:
-                            await bot.send_at_message(chat_id, error_msg, [wxid])
-                        else:
-                            await bot.send_text_message(chat_id, error_msg)
-                        return False
-                elif time_period_str == "每小时":
-                    reminder_type = "every_hour"
-                    reminder_time = ""
-                    next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-                elif time_period_str == "每周":
-                    reminder_type = "every_week"
-                    reminder_time = ""
-                    next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-                else:
-                    try:
-                        reminder_time_obj = parser.parse(time_period_str)
-                        reminder_type = "one_time"
-                        reminder_time = str(reminder_time_obj)
-                        next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-                    except ValueError:
-                        error_msg = "\n不支持的时间/周期格式"
-                        if is_group_chat:
-                            await bot.send_at_message(chat_id, error_msg, [wxid])
-                        else:
-                            await bot.send_text_message(chat_id, error_msg)
-                        return False
+                reminder_type, reminder_time, next_time, error_msg = await self._parse_time_period(time_period_str)
+                if error_msg:
+                    at_list = [wxid] if is_group_chat else None
+                    await self._send_message(bot, chat_id, error_msg, at_list)
+                    return False
+
+                quota_error = self._check_quota(wxid, chat_id, [reminder_type])
+                if quota_error:
+                    at_list = [wxid] if is_group_chat else None
+                    await self._send_message(bot, chat_id, quota_error, at_list)
+                    return False
 
                 if await self._check_point(bot, message):
                     new_id = await self.store_reminder(wxid, reminder_content, reminder_type, reminder_time, chat_id)
@@ -389,6 +521,7 @@ class Reminder(PluginBase):
                         else:
                             await bot.send_text_message(chat_id, output)
                     else:
+                        self._refund_quota(wxid, chat_id)
                         error_msg = "\n存储备忘录失败，请稍后再试"
                         if is_group_chat:
                             await bot.send_at_message(chat_id, error_msg, [wxid])
@@ -396,6 +529,7 @@ class Reminder(PluginBase):
                             await bot.send_text_message(chat_id, error_msg)
                     return False
                 else:
+                    self._refund_quota(wxid, chat_id)
                     logger.warning(f"用户 {wxid} 触发风控保护机制")
                     return False
 
@@ -432,6 +566,26 @@ class Reminder(PluginBase):
                     await bot.send_text_message(chat_id, empty_msg)
             return False
 
+        elif content.startswith(self.search_command):
+            keyword = content[len(self.search_command):].strip()
+            at_list = [wxid] if is_group_chat else None
+            if not keyword:
+                await self._send_message(bot, chat_id, "\n参数错误！请使用：搜索 <关键词>", at_list)
+                return False
+            reminders = await self.search_reminders(wxid, keyword, self.search_limit)
+            if reminders:
+                output = f"🔍-----XXXBOT-----🔍\n包含“{keyword}”的记录（最多显示 {self.search_limit} 条）：\n"
+                for id, content, reminder_type, reminder_time, _ in reminders:
+                    next_time = await self.calculate_remind_time(reminder_type, reminder_time)
+                    if next_time:
+                        output += f"👉 {id}. {content} (提醒时间：{next_time.strftime('%Y-%m-%d %H:%M')})\n"
+                    else:
+                        output += f"👉 {id}. {content} (提醒时间：未知)\n"
+            else:
+                output = f"没有找到包含“{keyword}”的记录😔"
+            await self._send_message(bot, chat_id, output, at_list)
+            return False
+
         elif content.startswith(self.delete_command):
             try:
                 delete_id = content[len(self.delete_command):].strip()
@@ -492,13 +646,14 @@ class Reminder(PluginBase):
             help_message += "📝提醒指令示例:\n - 记录 10分钟后 提醒我喝水\n - 记录 每天 8:00 提醒我吃早饭\n"
             help_message += " - 记录 每周一 9:00 开周会\n - 记录 每月 8号 8:00 开会\n - 记录 每年 3月15日 生日快乐\n"
             help_message += " - 记录 17:30 下班提醒\n\n"
+            help_message += "📚批量创建:\n - 记录 后换行，每行一条 [时间/周期] [内容]，全部校验通过才会存储，积分按条数一次扣除\n\n"
             help_message += "🔄插件联动功能:\n"
             help_message += " - 如果提醒内容以\"提醒\"开头，将作为简单提醒发送\n"
             help_message += " - 其他提醒内容将模拟用户发送消息，可触发任何插件或AI回复\n"
             help_message += " - 例如: 记录 每天 8:00 天气 北京 (将触发天气插件)\n"
             help_message += " - 例如: 记录 每天 12:00 新闻 (将触发新闻插件)\n"
             help_message += " - 例如: 记录 每周一 9:00 帮我总结上周工作 (将触发AI回复)\n\n"
-            help_message += "📋管理提醒:\n - 我的记录 (查看所有提醒)\n - 删除 序号 (取消单个提醒)\n"
+            help_message += "📋管理提醒:\n - 我的记录 (查看所有提醒)\n - 搜索 关键词 (搜索提醒)\n - 删除 序号 (取消单个提醒)\n"
             help_message += " - 删除 全部 (取消所有提醒)\n - 记录帮助 (查看帮助信息)"
             at_list = [wxid] if is_group_chat else None
             await self._send_message(bot, chat_id, help_message, at_list)
@@ -506,59 +661,468 @@ class Reminder(PluginBase):
 
         return True
 
+    async def _handle_batch_store(self, bot: WechatAPIClient, message: dict, lines: List[str]) -> bool:
+        """多行记录：每行一条，全部校验通过后一次性存储并只扣一次积分，创建频率按条数计算"""
+        wxid = message["SenderWxid"]
+        chat_id = message["FromWxid"]
+        at_list = [wxid] if chat_id.endswith("chatroom") else None
+
+        max_batch_size = self.max_batch_size
+        if wxid not in self.admins and self.create_limiter.enabled:
+            max_batch_size = min(max_batch_size, self.create_limiter.capacity)
+        if len(lines) > max_batch_size:
+            await self._send_message(bot, chat_id, f"\n❌一次最多批量创建 {max_batch_size} 条记录", at_list)
+            return False
+
+        entries = []
+        next_times = []
+        errors = []
+        for line_no, line in enumerate(lines, 1):
+            parts = line.split(maxsplit=2)
+            if len(parts) < 2:
+                errors.append(f"第{line_no}行：参数错误！请使用：[时间/周期] [内容]")
+                continue
+            try:
+                reminder_type, reminder_time, next_time, error_msg = await self._parse_time_period(parts[0])
+            except ValueError:
+                error_msg = "时间格式错误"
+            if error_msg:
+                errors.append(f"第{line_no}行：{error_msg.strip()}")
+                continue
+            entries.append((parts[1], reminder_type, reminder_time))
+            next_times.append(next_time)
+
+        if errors:
+            output = "\n❌以下记录格式有误，本次未存储任何记录：\n" + "\n".join(errors)
+            await self._send_message(bot, chat_id, output, at_list)
+            return False
+
+        quota_error = self._check_quota(wxid, chat_id, [reminder_type for _, reminder_type, _ in entries])
+        if quota_error:
+            await self._send_message(bot, chat_id, quota_error, at_list)
+            return False
+
+        if not await self._check_point(bot, message, len(entries)):
+            self._refund_quota(wxid, chat_id, len(entries))
+            logger.warning(f"用户 {wxid} 触发风控保护机制")
+            return False
+
+        new_ids = await self.store_reminders(wxid, chat_id, entries)
+        if new_ids is None:
+            self._refund_quota(wxid, chat_id, len(entries))
+            await self._send_message(bot, chat_id, "\n存储备忘录失败，请稍后再试", at_list)
+            return False
+
+        output = f"🎉成功存储 {len(new_ids)} 条备忘录\n"
+        for new_id, (reminder_content, _, _), next_time in zip(new_ids, entries, next_times):
+            remind_at = next_time.strftime('%Y-%m-%d %H:%M') if next_time else "未知"
+            output += f"👉 {new_id}. {reminder_content} (提醒时间：{remind_at})\n"
+        await self._send_message(bot, chat_id, output, at_list)
+        return False
+
+    async def _parse_time_period(self, time_period_str: str) -> Tuple[Optional[str], Optional[str], Optional[datetime], Optional[str]]:
+        """解析时间/周期，返回 (提醒类型, 提醒时间, 下次提醒时间, 错误信息)"""
+        reminder_type = None
+        reminder_time = None
+        next_time = None
+
+        if "分钟后" in time_period_str:
+            reminder_type = "minutes_later"
+            reminder_time = time_period_str
+            now = datetime.now()
+            minutes = int(reminder_time.replace("分钟后", ""))
+            next_time = now + timedelta(minutes=minutes)
+        elif "小时后" in time_period_str:
+            reminder_type = "hours_later"
+            reminder_time = time_period_str
+            now = datetime.now()
+            hours = int(reminder_time.replace("小时后", ""))
+            next_time = now + timedelta(hours=hours)
+        elif "天后" in time_period_str:
+            reminder_type = "days_later"
+            reminder_time = time_period_str
+            now = datetime.now()
+            days = int(reminder_time.replace("天后", ""))
+            next_time = now + timedelta(days=days)
+        elif "今天" in time_period_str:
+            reminder_type = "one_time"
+            now = datetime.now()
+            # 提取时间部分，格式如"今天 12:30"
+            time_match = re.search(r'今天\s*(\d{1,2}:\d{2})', time_period_str)
+            if time_match:
+                time_str = time_match.group(1)
+                hour, minute = map(int, time_str.split(':'))
+                next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                # 如果时间已经过去，则设置为明天
+                if next_time < now:
+                    return None, None, None, "\n指定的时间已经过去，请重新设置"
+                reminder_time = next_time.strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                return None, None, None, "\n时间格式错误！请使用：今天 HH:MM 格式"
+        elif "明天" in time_period_str:
+            reminder_type = "one_time"
+            now = datetime.now()
+            # 提取时间部分，格式如"明天 12:30"
+            time_match = re.search(r'明天\s*(\d{1,2}:\d{2})', time_period_str)
+            if time_match:
+                time_str = time_match.group(1)
+                hour, minute = map(int, time_str.split(':'))
+                next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(days=1)
+                reminder_time = next_time.strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                return None, None, None, "\n时间格式错误！请使用：明天 HH:MM 格式"
+        elif "后天" in time_period_str:
+            reminder_type = "one_time"
+            now = datetime.now()
+            # 提取时间部分，格式如"后天 12:30"
+            time_match = re.search(r'后天\s*(\d{1,2}:\d{2})', time_period_str)
+            if time_match:
+                time_str = time_match.group(1)
+                hour, minute = map(int, time_str.split(':'))
+                next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(days=2)
+                reminder_time = next_time.strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                return None, None, None, "\n时间格式错误！请使用：后天 HH:MM 格式"
+        elif re.match(r"^\d{2}:\d{2}$", time_period_str):
+            reminder_type = "daily"
+            reminder_time = time_period_str
+            next_time = await self.calculate_remind_time(reminder_type, reminder_time)
+        elif "每年" in time_period_str:
+            reminder_type = "yearly"
+            reminder_time = time_period_str.replace("每年", "")
+            next_time = await self.calculate_remind_time(reminder_type, reminder_time)
+        elif "每月" in time_period_str:
+            reminder_type = "monthly"
+            reminder_time = time_period_str.replace("每月", "")
+            next_time = await self.calculate_remind_time(reminder_type, reminder_time)
+        elif "每周" in time_period_str:
+            reminder_type = "weekly"
+            day_mapping = {"一": "1", "二": "2", "三": "3", "四": "4", "五": "5", "六": "6", "日": "7"}
+            match = re.match(r"每周([一二三四五六日])\s*(\d{1,2}:\d{2})", time_period_str)
+            if match:
+                weekday = day_mapping[match.group(1)]
+                time_str = match.group(2)
+                reminder_time = f"{weekday} {time_str}"
+                next_time = await self.calculate_remind_time(reminder_type, reminder_time)
+            else:
+                return None, None, None, "\n格式错误，请使用：每周一 9:00"
+        elif time_period_str.startswith("每天"):
+            reminder_type = "every_day"
+            # 提取时间部分
+            time_match = re.search(r'每天\s*(\d{1,2}:\d{2})', time_period_str)
+            if time_match:
+                reminder_time = time_match.group(1)
+                next_time = await self.calculate_remind_time(reminder_type, reminder_time)
+            else:
+                return None, None, None, "\n时间格式错误！请使用：每天 HH:MM 格式"
+        elif time_period_str == "每小时":
+            reminder_type = "every_hour"
+            reminder_time = ""
+            next_time = await self.calculate_remind_time(reminder_type, reminder_time)
+        elif time_period_str == "每周":
+            reminder_type = "every_week"
+            reminder_time = ""
+            next_time = await self.calculate_remind_time(reminder_type, reminder_time)
+        else:
+            try:
+                reminder_time_obj = parser.parse(time_period_str)
+                reminder_type = "one_time"
+                reminder_time = str(reminder_time_obj)
+                next_time = await self.calculate_remind_time(reminder_type, reminder_time)
+            except ValueError:
+                return None, None, None, "\n不支持的时间/周期格式"
+
+        return reminder_type, reminder_time, next_time, None
+
     @schedule('interval', seconds=30)
+    @timed("check_reminders")
     async def check_reminders(self, bot: WechatAPIClient):
+        if self.profile_ticks_left > 0:
+            self.profiler.enable()
+            try:
+                await self._check_reminders(bot)
+            finally:
+                self.profiler.disable()
+                self.profile_ticks_left -= 1
+                if self.profile_ticks_left == 0:
+                    self._dump_profile()
+        else:
+            await self._check_reminders(bot)
+
+    def _dump_profile(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        profile_path = os.path.join(self.profile_dir, f"check_reminders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+        try:
+            self.profiler.dump_stats(profile_path)
+            logger.info(f"性能采样已保存到 {profile_path}")
+        except OSError as e:
+            logger.error(f"保存性能采样失败: {e}")
+        finally:
+            self.profiler = None
+
+    async def _load_index(self):
+        """从所有用户数据库加载待触发提醒到内存索引"""
+        self.index.clear()
+        self.retry_queue = []
+        for filename in os.listdir(self.data_dir):
+            if not (filename.startswith("user_") and filename.endswith(".db")):
+                continue
+            wxid = filename[5:-3]
+            try:
+                conn = sqlite3.connect(os.path.join(self.data_dir, filename))
+                try:
+                    rows = conn.execute("SELECT id, reminder_type, reminder_time, chat_id, substr(content, 1, 2) = '提醒' FROM reminders "
+                                        "WHERE wxid = ? AND is_done = 0", (wxid,)).fetchall()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.exception(f"加载用户 {wxid} 的提醒失败: {e}")
+                continue
+            for reminder_id, reminder_type, reminder_time, chat_id, is_simple in rows:
+                priority = PRIORITY_EXACT if is_simple else PRIORITY_SPREAD
+                offset = self._jitter_offset(wxid, priority)
+                # 从 now - offset 推算：在原定时间和错开后的时间之间重启时，本次提醒不会被推到下一周期
+                next_time = await self.calculate_remind_time(reminder_type, reminder_time, datetime.now() - timedelta(seconds=offset))
+                if next_time:
+                    fire_at = next_time.timestamp() + offset
+                    self.index.append(reminder_id, fire_at, reminder_type, wxid, chat_id, priority)
+        self.index.sort()
+        self.index_loaded = True
+        logger.info(f"提醒索引加载完成，共 {len(self.index)} 条，占用 {self.index.nbytes()} 字节")
+
+    @staticmethod
+    def _reminder_priority(content: str) -> int:
+        return PRIORITY_EXACT if content.startswith("提醒") else PRIORITY_SPREAD
+
+    def _jitter_offset(self, wxid: str, priority: int) -> int:
+        """错开触发的秒数，只取决于用户：同一用户的错开提醒整体平移，相互顺序不变；
+        准点的简单提醒不平移，与错开提醒之间的先后顺序不作保证"""
+        if priority == PRIORITY_EXACT or self.jitter_window <= 0:
+            return 0
+        return zlib.crc32(wxid.encode()) % self.jitter_window
+
+    async def _index_reminder(self, reminder_id: int, reminder_type: str, reminder_time: str, wxid: str, chat_id: str,
+                              priority: int, now: Optional[datetime] = None, batch: Optional[list] = None):
+        """计算下次触发时间并加入索引；传入 batch 时只收集，由调用方统一 merge"""
+        if not self.index_loaded:
+            return
+        next_time = await self.calculate_remind_time(reminder_type, reminder_time, now)
+        if next_time:
+            fire_at = next_time.timestamp() + self._jitter_offset(wxid, priority)
+            if batch is None:
+                self.index.add(reminder_id, fire_at, reminder_type, wxid, chat_id, priority)
+            else:
+                batch.append((reminder_id, fire_at, reminder_type, wxid, chat_id, priority))
+
+    async def _check_reminders(self, bot: WechatAPIClient):
+        if not self.index_loaded:
+            await self._load_index()
+
         now = datetime.now()
         buffer_time = timedelta(seconds=30)
-        check_start = now - buffer_time
-        check_end = now + buffer_time
+        check_start = (now - buffer_time).timestamp()
+        check_end = (now + buffer_time).timestamp()
 
-        wxids = set()
+        # 重试的提醒不做错过时间检查，否则上次出错的提醒到这次检查时已经过了 check_start
+        retries, self.retry_queue = self.retry_queue, []
+        due = [(entry, None) for entry in retries] + [(entry, check_start) for entry in self.index.pop_due(check_end)]
 
-        for filename in os.listdir(self.data_dir):
-            if filename.startswith("user_") and filename.endswith(".db"):
-                wxid = filename[5:-3]
-                wxids.add(wxid)
+        fired = 0
+        rescheduled = []
+        try:
+            for entry, missed_before in due:
+                reminder_id, fire_at, reminder_type, priority, wxid, chat_id = entry
+                try:
+                    with self._slow("check_reminders.fire", wxid, reminder_id):
+                        if await self._fire_reminder(bot, reminder_id, fire_at, reminder_type, priority, wxid, chat_id,
+                                                     missed_before, rescheduled):
+                            fired += 1
+                except Exception as e:
+                    logger.exception(f"处理用户 {wxid} 的提醒 {reminder_id} 时出错，下次检查重试: {e}")
+                    # 发送前出错（如数据库被锁）时留待下次检查重试，避免提醒从此不再触发
+                    self.retry_queue.append(entry)
+        finally:
+            # 周期提醒的下一次触发统一并入索引，避免大量提醒同时触发时逐条插入
+            self.index.merge(rescheduled)
+        self.stats.record_fires(fired)
+
+    async def _fire_reminder(self, bot: WechatAPIClient, reminder_id: int, fire_at: float, reminder_type: str,
+                             priority: int, wxid: str, chat_id: str, missed_before: Optional[float],
+                             rescheduled: list) -> bool:
+        """触发一条到期提醒，实际发送时返回 True
+
+        早于 missed_before 的提醒视为已错过（重试时传 None），周期提醒的下一次收集到 rescheduled 中。
+        """
+        # 内容不常驻内存，触发时再读取；读不到说明提醒已被删除
+        with self._slow("sqlite.load", wxid, reminder_id):
+            row = load_reminder(self.get_db_path(wxid), reminder_id)
+        if row is None:
+            return False
+        content, reminder_time = row
+
+        # 周期提醒先排好下一次再发送：发送之后的步骤不会再抛出异常，出错重试时也不会重复发送
+        if reminder_type in RECURRING_TYPES:
+            # 从本次的原定时间往后推算，避免提前触发的提醒在下一次检查时重复触发
+            scheduled_at = fire_at - self._jitter_offset(wxid, priority)
+            base_time = max(datetime.fromtimestamp(scheduled_at), datetime.now())
+            await self._index_reminder(reminder_id, reminder_type, reminder_time, wxid, chat_id, priority, base_time, rescheduled)
+            logger.info(f"已更新提醒 {reminder_id} 的下次提醒时间")
+
+        if missed_before is not None and fire_at < missed_before:
+            logger.warning(f"提醒 {reminder_id} 已错过触发时间 {datetime.fromtimestamp(fire_at)}")
+            return False
 
-        for wxid in wxids:
-            try:
-                reminders = await self.query_reminders(wxid)
-                if reminders:
-                    for id, content, reminder_type, reminder_time, chat_id in reminders:
-                        try:
-                            if reminder_type == "every_day":
-                                next_time = await self.calculate_remind_time("every_day", reminder_time)
-                            else:
-                                next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-
-                            if next_time and check_start <= next_time <= check_end:
-                                await self.send_reminder(bot, wxid, content, id, chat_id)
-
-                                if reminder_type in ["daily", "weekly", "monthly", "yearly", "every_hour", "every_day", "every_week"]:
-                                    new_next_time = await self.calculate_remind_time(reminder_type, reminder_time)
-                                    if new_next_time:
-                                        db_path = self.get_db_path(wxid)
-                                        conn = sqlite3.connect(db_path)
-                                        cursor = conn.cursor()
-                                        try:
-                                            cursor.execute(
-                                                "UPDATE reminders SET reminder_time = ? WHERE id = ?",
-                                                (reminder_time, id)
-                                            )
-                                            conn.commit()
-                                            logger.info(f"已更新提醒 {id} 的下次提醒时间为 {new_next_time}")
-                                        except sqlite3.Error as e:
-                                            logger.error(f"更新提醒时间失败: {e}")
-                                        finally:
-                                            conn.close()
-                                else:
-                                    await self.delete_reminder(wxid, id)
+        with self._slow("send_reminder", wxid, reminder_id):
+            await self.send_reminder(bot, wxid, content, reminder_id, chat_id)
+
+        if reminder_type not in RECURRING_TYPES:
+            # 已经从索引中取出，只需删除数据库记录
+            await self._delete_reminder_row(wxid, reminder_id)
+        return True
 
-                        except ValueError as e:
-                            logger.warning(f"时间格式错误，无法执行提醒 {id}: {e}")
+    @schedule('interval', hours=1)
+    async def scheduled_backup(self, bot: WechatAPIClient):
+        if not self.backup_enable or datetime.now().hour != self.backup_hour:
+            return
+        # 以最近一份备份的日期判断，重启后也不会在同一天重复备份
+        backups = list_backups(self.backup_dir)
+        if backups and backups[0]["name"].startswith(datetime.now().strftime('%Y%m%d')):
+            return
+        await self.run_backup()
 
+    async def run_backup(self) -> Optional[dict]:
+        """在线程中执行备份，不阻塞事件循环；同一时间只运行一个备份或恢复任务"""
+        if self.backup_lock.locked():
+            return None
+        async with self.backup_lock:
+            try:
+                manifest = await asyncio.to_thread(backup_databases, self.data_dir, self.backup_dir,
+                                                   self.backup_pages, self.backup_sleep)
+                removed = await asyncio.to_thread(rotate_backups, self.backup_dir, self.backup_keep)
+            except Exception as e:
+                logger.exception(f"备份提醒数据失败: {e}")
+                return None
+        logger.info(f"备份提醒数据完成: {manifest['name']}，{manifest['files']} 个数据库，耗时 {manifest['duration_seconds']}s，清理旧备份 {removed}")
+        return manifest
+
+    async def _handle_backup_command(self) -> str:
+        manifest = await self.run_backup()
+        if manifest is None:
+            return "❌备份失败或已有备份/恢复任务在进行，请稍后再试"
+        return f"💾备份完成：{manifest['name']}\n📁数据库：{manifest['files']} 个\n⏱️耗时：{manifest['duration_seconds']}s"
+
+    async def _handle_restore_command(self, name: str) -> str:
+        if not name:
+            backups = list_backups(self.backup_dir)
+            if not backups:
+                return "暂无备份"
+            output = "💾-----可用备份-----💾\n"
+            for backup in backups:
+                output += f"👉 {backup['name']} ({backup['files']} 个数据库，耗时 {backup['duration_seconds']}s)\n"
+            output += "发送 记录恢复 <备份名> 进行恢复"
+            return output
+
+        if self.backup_lock.locked():
+            return "❌已有备份/恢复任务在进行，请稍后再试"
+        async with self.backup_lock:
+            # 先在线程中把备份复制为临时文件，期间正在使用的数据库不受影响
+            try:
+                staged = await asyncio.to_thread(stage_restore, self.backup_dir, name, self.data_dir,
+                                                 self.backup_pages, self.backup_sleep)
             except Exception as e:
-                logger.exception(f"处理用户 {wxid} 的提醒时出错: {e}")
+                logger.exception(f"恢复备份 {name} 失败: {e}")
+                return f"❌恢复备份 {name} 失败，请查看日志"
+            if staged is None:
+                return f"❌备份 {name} 不存在"
+
+            # 所有用户数据库都在事件循环线程中短暂打开且不跨 await 持有事务，
+            # 在这里同步替换文件时不会有连接正在读写
+            commit_restore(self.data_dir, staged)
+            self.prepared_dbs.clear()
+            self.fts_unavailable.clear()
+            # 索引在下次检查时重新加载，统计从恢复后的数据重建
+            self.index_loaded = False
+            await asyncio.to_thread(self.stats.rebuild)
+        logger.info(f"已从备份 {name} 恢复 {len(staged)} 个数据库")
+        return f"♻️已从备份 {name} 恢复 {len(staged)} 个数据库"
+
+    def _check_quota(self, wxid: str, chat_id: str, reminder_types: List[str]) -> Optional[str]:
+        """在写入数据库前检查配额，超出限制时返回提示信息"""
+        if wxid in self.admins:
+            return None
+
+        if self.min_recurring_interval:
+            for reminder_type in reminder_types:
+                interval = RECURRING_INTERVAL_MINUTES.get(reminder_type)
+                if interval is not None and interval < self.min_recurring_interval:
+                    return f"\n❌周期提醒的间隔不能小于 {self.min_recurring_interval} 分钟"
+
+        count = len(reminder_types)
+        if self.max_reminders_per_user and self.stats.user_pending(wxid) + count > self.max_reminders_per_user:
+            return f"\n❌每人最多保留 {self.max_reminders_per_user} 条记录，请先删除不需要的记录"
+        if self.max_reminders_per_chat and self.stats.chat_pending(chat_id) + count > self.max_reminders_per_chat:
+            return f"\n❌当前会话最多保留 {self.max_reminders_per_chat} 条记录，请先删除不需要的记录"
+
+        # 每条记录消耗一个令牌；之后扣积分或存储失败时需调用 _refund_quota 归还
+        wait = self.create_limiter.try_acquire(self._quota_keys(wxid, chat_id), count)
+        if wait == float("inf"):
+            return f"\n❌一次最多创建 {self.create_limiter.capacity} 条记录"
+        if wait > 0:
+            return f"\n⏳创建记录太频繁啦，请 {int(wait) + 1} 秒后再试"
+        return None
+
+    @staticmethod
+    def _quota_keys(wxid: str, chat_id: str) -> List[str]:
+        return [f"user:{wxid}", f"chat:{chat_id}"]
+
+    def _refund_quota(self, wxid: str, chat_id: str, count: int = 1):
+        """通过配额检查但最终没有创建成功时，归还本次消耗的 count 个创建令牌"""
+        if wxid not in self.admins:
+            self.create_limiter.refund(self._quota_keys(wxid, chat_id), count)
+
+    def _format_stats(self) -> str:
+        summary = self.stats.summary()
+        output = "📊-----记录统计-----📊\n"
+        output += f"📝待触发提醒：{summary['total']}\n"
+        output += f"👥活跃用户：{summary['active_users']}\n"
+        output += f"⏰累计触发：{summary['fires']}\n"
+        if summary["types"]:
+            output += "——————————————————\n按类型：\n"
+            for reminder_type, count in sorted(summary["types"].items(), key=lambda item: -item[1]):
+                output += f" - {reminder_type}: {count}\n"
+        if summary["top_chats"]:
+            output += "——————————————————\n热门会话：\n"
+            for chat, count in summary["top_chats"]:
+                output += f" - {chat}: {count}\n"
+        if summary["hourly_fires"]:
+            output += "——————————————————\n近24小时每小时触发：\n"
+            for hour, fires in summary["hourly_fires"]:
+                output += f" - {hour}时: {fires}\n"
+        return output
+
+    def _handle_profile_command(self, content: str) -> str:
+        """管理员性能命令：无参数时输出计时统计，带参数时采样接下来 N 次检查"""
+        arg = content[len(self.profile_command):].strip()
+        if arg:
+            try:
+                ticks = int(arg)
+            except ValueError:
+                return "\n参数错误！请使用：记录性能 [采样次数]"
+            if ticks <= 0 or ticks > 100:
+                return "\n采样次数需在 1-100 之间"
+            if self.profiler is None:
+                self.profiler = cProfile.Profile()
+            self.profile_ticks_left = ticks
+            return f"📈已开始采样接下来 {ticks} 次提醒检查，结果将保存到 {self.profile_dir}"
+
+        if not self.profile_enable:
+            return "性能监控未开启，请在配置中设置 profile_enable = true"
+        if not self.timing_stats:
+            return "暂无计时数据"
+        output = f"📈-----性能统计-----\n慢操作阈值：{self.slow_threshold * 1000:.0f}ms\n"
+        for phase, (count, total, worst) in sorted(self.timing_stats.items(), key=lambda item: -item[1][1]):
+            output += f"👉 {phase}: {count}次 平均{total / count * 1000:.1f}ms 最大{worst * 1000:.1f}ms\n"
+        return output
 
     async def send_reminder(self, bot, wxid: str, content: str, reminder_id: int, chat_id: str):
         try:
@@ -602,7 +1166,8 @@ class Reminder(PluginBase):
                     actual_bot = bot.bot if hasattr(bot, 'bot') else bot
 
                     # 触发文本消息事件
-                    await EventManager.emit("text_message", actual_bot, simulated_message)
+                    with self._slow("event_emit", wxid, reminder_id):
+                        await EventManager.emit("text_message", actual_bot, simulated_message)
                     logger.info(f"成功模拟用户消息: {content}")
                 except Exception as e:
                     logger.error(f"模拟用户消息失败: {e}")
@@ -701,7 +1266,7 @@ class Reminder(PluginBase):
             logger.error(f"获取用户 {wxid} 昵称失败: {e}")
             return "用户"
 
-    async def _check_point(self, bot, message: dict) -> bool:
+    async def _check_point(self, bot, message: dict, count: int = 1) -> bool:
         wxid = message["SenderWxid"]
         chat_id = message["FromWxid"]
         is_group_chat = chat_id.endswith("chatroom")
@@ -714,18 +1279,20 @@ class Reminder(PluginBase):
         elif self.db.get_whitelist(wxid) and self.whitelist_ignore:
             return True
         else:
-            if self.db.get_points(wxid) < self.price:
-                error_msg = f"\n😭-----XXXBOT-----\n你的积分不够啦！需要 {self.price} 积分"
+            price = self.price * count
+            if self.db.get_points(wxid) < price:
+                error_msg = f"\n😭-----XXXBOT-----\n你的积分不够啦！需要 {price} 积分"
 
                 # 发送消息
                 at_list = [wxid] if is_group_chat else None
                 await self._send_message(bot, chat_id, error_msg, at_list)
                 return False
-            self.db.add_points(wxid, -self.price)
+            self.db.add_points(wxid, -price)
             return True
 
-    async def calculate_remind_time(self, reminder_type: str, reminder_time: str) -> Optional[datetime]:
-        now = datetime.now()
+    async def calculate_remind_time(self, reminder_type: str, reminder_time: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        if now is None:
+            now = datetime.now()
         try:
             if reminder_type == "one_time":
                 if isinstance(reminder_time, str):
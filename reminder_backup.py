@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from loguru import logger
+
+MANIFEST_NAME = "backup.json"
+PARTIAL_SUFFIX = ".partial"
+RESTORE_SUFFIX = ".restore"
+
+
+def _copy_database(src_path: str, dst_path: str, pages: int, sleep: float):
+    """使用 SQLite 在线备份 API 分批复制页面，期间其他连接仍可读写"""
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst, pages=pages, sleep=sleep)
+    finally:
+        dst.close()
+        src.close()
+
+
+def _user_databases(directory: str) -> List[str]:
+    return sorted(name for name in os.listdir(directory) if name.startswith("user_") and name.endswith(".db"))
+
+
+def backup_databases(data_dir: str, backup_root: str, pages: int, sleep: float) -> dict:
+    """把所有用户数据库快照到 backup_root 下以时间命名的目录，返回备份清单"""
+    name = datetime.now().strftime('%Y%m%d_%H%M%S')
+    target = os.path.join(backup_root, name)
+    partial = target + PARTIAL_SUFFIX
+    os.makedirs(partial, exist_ok=True)
+
+    start = time.perf_counter()
+    files = []
+    try:
+        for filename in _user_databases(data_dir):
+            try:
+                _copy_database(os.path.join(data_dir, filename), os.path.join(partial, filename), pages, sleep)
+                files.append(filename)
+            except sqlite3.Error as e:
+                logger.error(f"备份数据库 {filename} 失败: {e}")
+        manifest = {
+            "name": name,
+            "created": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "files": len(files),
+            "duration_seconds": round(time.perf_counter() - start, 3),
+        }
+        with open(os.path.join(partial, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        # 全部写完再改名，未完成的备份不会出现在备份列表中
+        os.rename(partial, target)
+    except Exception:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    return manifest
+
+
+def list_backups(backup_root: str) -> List[dict]:
+    """按时间从新到旧返回已完成备份的清单"""
+    if not os.path.isdir(backup_root):
+        return []
+    backups = []
+    for name in sorted(os.listdir(backup_root), reverse=True):
+        manifest_path = os.path.join(backup_root, name, MANIFEST_NAME)
+        if name.endswith(PARTIAL_SUFFIX) or not os.path.isfile(manifest_path):
+            continue
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                backups.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取备份清单 {manifest_path} 失败: {e}")
+    return backups
+
+
+def rotate_backups(backup_root: str, keep: int) -> List[str]:
+    """只保留最新的 keep 份备份，返回被删除的备份名"""
+    removed = [backup["name"] for backup in list_backups(backup_root)[keep:]]
+    for name in removed:
+        shutil.rmtree(os.path.join(backup_root, name), ignore_errors=True)
+    return removed
+
+
+def stage_restore(backup_root: str, name: str, data_dir: str, pages: int, sleep: float) -> Optional[List[str]]:
+    """把指定备份复制为数据目录中的临时文件，备份不存在时返回 None，否则返回待替换的数据库文件名
+
+    此步骤不触碰正在使用的数据库，可以在线程中执行；之后由 commit_restore 一次性替换。
+    """
+    if name not in {backup["name"] for backup in list_backups(backup_root)}:
+        return None
+    source = os.path.join(backup_root, name)
+    staged = []
+    try:
+        for filename in _user_databases(source):
+            staging_path = os.path.join(data_dir, filename + RESTORE_SUFFIX)
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+            staged.append(filename)
+            _copy_database(os.path.join(source, filename), staging_path, pages, sleep)
+    except Exception:
+        discard_restore(data_dir, staged)
+        raise
+    return staged
+
+
+def commit_restore(data_dir: str, filenames: List[str]):
+    """用 os.replace 原子替换数据库文件；备份之后新建的用户数据库保持不变
+
+    必须在没有连接正在读写这些数据库时调用（插件中在事件循环线程里执行）。
+    """
+    for filename in filenames:
+        os.replace(os.path.join(data_dir, filename + RESTORE_SUFFIX), os.path.join(data_dir, filename))
+
+
+def discard_restore(data_dir: str, filenames: List[str]):
+    for filename in filenames:
+        try:
+            os.remove(os.path.join(data_dir, filename + RESTORE_SUFFIX))
+        except OSError:
+            pass
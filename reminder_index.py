@@ -0,0 +1,177 @@
+import sqlite3
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+# 提醒类型编码，索引中只保存一个字节的类型码
+REMINDER_TYPES = ("one_time", "daily", "every_day", "weekly", "monthly", "yearly", "every_hour", "every_week")
+TYPE_CODES = {name: code for code, name in enumerate(REMINDER_TYPES)}
+
+# 优先级：简单提醒准点发送，模拟用户消息的提醒可以在抖动窗口内错开
+PRIORITY_EXACT = 0
+PRIORITY_SPREAD = 1
+
+
+class ReminderIndex:
+    """紧凑的内存提醒索引
+
+    按下次触发时间排序的并行数组：每条提醒只占用 id(8) + 触发时间(8) + 类型码(1)
+    + 优先级(1) + wxid 编号(4) + chat_id 编号(4) = 26 字节，wxid/chat_id 通过字符串表去重，
+    提醒内容不进内存，触发时再从用户数据库读取。
+    """
+
+    __slots__ = ("ids", "fire_at", "types", "priorities", "owners", "chats", "_names", "_name_ids")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.fire_at = array("d")
+        self.types = array("b")
+        self.priorities = array("b")
+        self.owners = array("i")
+        self.chats = array("i")
+        self._names: List[str] = []
+        self._name_ids = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def add(self, reminder_id: int, fire_at: float, reminder_type: str, wxid: str, chat_id: str,
+            priority: int = PRIORITY_EXACT):
+        """插入一条提醒，保持按触发时间有序"""
+        pos = bisect_right(self.fire_at, fire_at)
+        self.ids.insert(pos, reminder_id)
+        self.fire_at.insert(pos, fire_at)
+        self.types.insert(pos, TYPE_CODES[reminder_type])
+        self.priorities.insert(pos, priority)
+        self.owners.insert(pos, self._intern(wxid))
+        self.chats.insert(pos, self._intern(chat_id))
+
+    def merge(self, entries: List[Tuple[int, float, str, str, str, int]]):
+        """一次并入多条 (id, 触发时间, 类型, wxid, chat_id, 优先级)
+
+        先定位插入位置，再按段拷贝生成新数组，整体只移动一次数据；逐条 add 每次都要移动插入点之后的全部元素。
+        """
+        if not entries:
+            return
+        entries = sorted(entries, key=lambda entry: entry[1])
+        positions = [bisect_right(self.fire_at, entry[1]) for entry in entries]
+        new_values = (
+            ("ids", [entry[0] for entry in entries]),
+            ("fire_at", [entry[1] for entry in entries]),
+            ("types", [TYPE_CODES[entry[2]] for entry in entries]),
+            ("owners", [self._intern(entry[3]) for entry in entries]),
+            ("chats", [self._intern(entry[4]) for entry in entries]),
+            ("priorities", [entry[5] for entry in entries]),
+        )
+        for name, values in new_values:
+            column = getattr(self, name)
+            merged = array(column.typecode)
+            start = 0
+            for pos, value in zip(positions, values):
+                merged += column[start:pos]
+                merged.append(value)
+                start = pos
+            merged += column[start:]
+            setattr(self, name, merged)
+
+    def append(self, reminder_id: int, fire_at: float, reminder_type: str, wxid: str, chat_id: str,
+               priority: int = PRIORITY_EXACT):
+        """批量加载时追加到末尾，全部追加完后必须调用 sort()"""
+        self.ids.append(reminder_id)
+        self.fire_at.append(fire_at)
+        self.types.append(TYPE_CODES[reminder_type])
+        self.priorities.append(priority)
+        self.owners.append(self._intern(wxid))
+        self.chats.append(self._intern(chat_id))
+
+    def sort(self):
+        order = sorted(range(len(self.fire_at)), key=self.fire_at.__getitem__)
+        self.ids = array("q", (self.ids[pos] for pos in order))
+        self.fire_at = array("d", (self.fire_at[pos] for pos in order))
+        self.types = array("b", (self.types[pos] for pos in order))
+        self.priorities = array("b", (self.priorities[pos] for pos in order))
+        self.owners = array("i", (self.owners[pos] for pos in order))
+        self.chats = array("i", (self.chats[pos] for pos in order))
+
+    def clear(self):
+        self.__init__()
+
+    def _delete(self, pos: int):
+        del self.ids[pos]
+        del self.fire_at[pos]
+        del self.types[pos]
+        del self.priorities[pos]
+        del self.owners[pos]
+        del self.chats[pos]
+
+    def remove(self, wxid: str, reminder_id: int) -> bool:
+        """删除指定用户的某条提醒，不存在时返回 False"""
+        owner = self._name_ids.get(wxid)
+        if owner is None:
+            return False
+        start = 0
+        while True:
+            try:
+                pos = self.ids.index(reminder_id, start)
+            except ValueError:
+                return False
+            if self.owners[pos] == owner:
+                self._delete(pos)
+                return True
+            start = pos + 1
+
+    def remove_owner(self, wxid: str) -> int:
+        """删除某个用户的全部提醒，返回删除条数"""
+        owner = self._name_ids.get(wxid)
+        if owner is None:
+            return 0
+        keep = [pos for pos, value in enumerate(self.owners) if value != owner]
+        removed = len(self.ids) - len(keep)
+        if removed:
+            self.ids = array("q", (self.ids[pos] for pos in keep))
+            self.fire_at = array("d", (self.fire_at[pos] for pos in keep))
+            self.types = array("b", (self.types[pos] for pos in keep))
+            self.priorities = array("b", (self.priorities[pos] for pos in keep))
+            self.owners = array("i", (self.owners[pos] for pos in keep))
+            self.chats = array("i", (self.chats[pos] for pos in keep))
+        return removed
+
+    def pop_due(self, until: float) -> List[Tuple[int, float, str, int, str, str]]:
+        """按触发时间顺序取出所有不晚于 until 的提醒：(id, 触发时间, 类型, 优先级, wxid, chat_id)"""
+        count = bisect_right(self.fire_at, until)
+        if not count:
+            return []
+        names = self._names
+        due = [
+            (self.ids[pos], self.fire_at[pos], REMINDER_TYPES[self.types[pos]], self.priorities[pos],
+             names[self.owners[pos]], names[self.chats[pos]])
+            for pos in range(count)
+        ]
+        del self.ids[:count]
+        del self.fire_at[:count]
+        del self.types[:count]
+        del self.priorities[:count]
+        del self.owners[:count]
+        del self.chats[:count]
+        return due
+
+    def nbytes(self) -> int:
+        """并行数组占用的字节数（不含字符串表）"""
+        return sum(column.itemsize * len(column) for column in (self.ids, self.fire_at, self.types, self.priorities, self.owners, self.chats))
+
+
+def load_reminder(db_path: str, reminder_id: int) -> Optional[Tuple[str, str]]:
+    """触发时按需从用户数据库读取提醒内容和时间，提醒已被删除时返回 None"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT content, reminder_time FROM reminders WHERE id = ?", (reminder_id,)).fetchone()
+    finally:
+        conn.close()
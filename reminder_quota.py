@@ -0,0 +1,80 @@
+import time
+from typing import Dict, Sequence
+
+# 各周期类型的最短触发间隔（分钟），用于限制过于频繁的周期提醒
+RECURRING_INTERVAL_MINUTES = {
+    "every_hour": 60,
+    "daily": 24 * 60,
+    "every_day": 24 * 60,
+    "weekly": 7 * 24 * 60,
+    "every_week": 7 * 24 * 60,
+    "monthly": 28 * 24 * 60,
+    "yearly": 365 * 24 * 60,
+}
+
+# 桶数量超过该值时清理已回满的桶，避免长期运行时无限增长
+MAX_IDLE_BUCKETS = 10000
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """按 key 划分的内存令牌桶，容量为 capacity，每分钟补充 per_minute 个令牌"""
+
+    def __init__(self, capacity: int, per_minute: float):
+        self.capacity = capacity
+        self.rate = per_minute / 60
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.rate > 0
+
+    def _refill(self, key: str, now: float) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.capacity, now)
+        else:
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+        return bucket
+
+    def try_acquire(self, keys: Sequence[str], count: int = 1) -> float:
+        """所有 key 的桶都有足够令牌时一起扣除并返回 0，否则不扣除并返回需要等待的秒数
+
+        count 超过桶容量时永远无法满足，返回 inf。
+        """
+        if not self.enabled:
+            return 0
+        if count > self.capacity:
+            return float("inf")
+        now = time.monotonic()
+        buckets = [self._refill(key, now) for key in keys]
+        wait = max((count - bucket.tokens) / self.rate for bucket in buckets)
+        if wait > 0:
+            return wait
+        for bucket in buckets:
+            bucket.tokens -= count
+        if len(self.buckets) > MAX_IDLE_BUCKETS:
+            self._prune(now)
+        return 0
+
+    def refund(self, keys: Sequence[str], count: int = 1):
+        """归还 try_acquire 扣除的令牌，用于请求最终没有执行的情况"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        for key in keys:
+            bucket = self._refill(key, now)
+            bucket.tokens = min(self.capacity, bucket.tokens + count)
+
+    def _prune(self, now: float):
+        full_after = self.capacity / self.rate
+        for key in [key for key, bucket in self.buckets.items() if now - bucket.updated >= full_after]:
+            del self.buckets[key]
@@ -0,0 +1,185 @@
+import os
+import sqlite3
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Tuple
+
+from loguru import logger
+
+STATS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS user_counts (
+        wxid TEXT PRIMARY KEY,
+        pending INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS chat_counts (
+        chat_id TEXT PRIMARY KEY,
+        pending INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS chat_counts_pending ON chat_counts (pending);
+    CREATE TABLE IF NOT EXISTS hourly_fires (
+        hour TEXT PRIMARY KEY,
+        fires INTEGER NOT NULL
+    );
+"""
+
+# 每小时触发次数只保留最近两天
+FIRE_HISTORY_HOURS = 48
+
+
+class ReminderStats:
+    """增量维护的全局统计
+
+    存储、删除、触发时更新 stats.db 中的汇总表，统计命令只读取这些小表，
+    耗时与用户数量无关。
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.db_path = os.path.join(data_dir, "stats.db")
+        self._pruned_hour = None
+        is_new = not os.path.exists(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executescript(STATS_SCHEMA)
+        finally:
+            conn.close()
+        if is_new:
+            self.rebuild()
+
+    def rebuild(self):
+        """从所有用户数据库重新统计待触发提醒，用于首次启用或恢复数据后"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.execute("DELETE FROM user_counts")
+                conn.execute("DELETE FROM chat_counts")
+                conn.execute("DELETE FROM counters WHERE name = 'total' OR name = 'active_users' OR name LIKE 'type:%'")
+            for filename in os.listdir(self.data_dir):
+                if filename.startswith("user_") and filename.endswith(".db"):
+                    wxid = filename[5:-3]
+                    try:
+                        user_conn = sqlite3.connect(os.path.join(self.data_dir, filename))
+                        try:
+                            rows = user_conn.execute("SELECT reminder_type, chat_id FROM reminders WHERE wxid = ? AND is_done = 0", (wxid,)).fetchall()
+                        finally:
+                            user_conn.close()
+                    except sqlite3.Error as e:
+                        logger.warning(f"统计用户 {wxid} 的提醒失败: {e}")
+                        continue
+                    if rows:
+                        self._apply(conn, wxid, rows, 1)
+            logger.info("提醒统计重建完成")
+        finally:
+            conn.close()
+
+    def record_store(self, wxid: str, rows: Iterable[Tuple[str, str]]):
+        """rows 为新增提醒的 (reminder_type, chat_id)"""
+        self._record(wxid, rows, 1)
+
+    def record_delete(self, wxid: str, rows: Iterable[Tuple[str, str]]):
+        """rows 为被删除提醒的 (reminder_type, chat_id)"""
+        self._record(wxid, rows, -1)
+
+    def record_fires(self, count: int, now: datetime = None):
+        """记录一次检查中触发的提醒数，每次检查只写一次"""
+        if count <= 0:
+            return
+        now = now or datetime.now()
+        hour = now.strftime('%Y-%m-%d %H')
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.execute("INSERT INTO hourly_fires (hour, fires) VALUES (?, ?) ON CONFLICT(hour) DO UPDATE SET fires = fires + excluded.fires",
+                             (hour, count))
+                # 只在进入新的小时时清理过期记录
+                if hour != self._pruned_hour:
+                    conn.execute("DELETE FROM hourly_fires WHERE hour < ?",
+                                 ((now - timedelta(hours=FIRE_HISTORY_HOURS)).strftime('%Y-%m-%d %H'),))
+                self._add_counter(conn, "fires", count)
+            self._pruned_hour = hour
+        except sqlite3.Error as e:
+            logger.error(f"更新触发统计失败: {e}")
+        finally:
+            conn.close()
+
+    def user_pending(self, wxid: str) -> int:
+        return self._pending("SELECT pending FROM user_counts WHERE wxid = ?", wxid)
+
+    def chat_pending(self, chat_id: str) -> int:
+        return self._pending("SELECT pending FROM chat_counts WHERE chat_id = ?", chat_id)
+
+    def summary(self, top: int = 5, hours: int = 24, now: datetime = None) -> dict:
+        """hourly_fires 只包含最近 hours 小时内有触发的小时，按时间倒序"""
+        since = ((now or datetime.now()) - timedelta(hours=hours - 1)).strftime('%Y-%m-%d %H')
+        conn = sqlite3.connect(self.db_path)
+        try:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            top_chats = conn.execute("SELECT chat_id, pending FROM chat_counts ORDER BY pending DESC LIMIT ?", (top,)).fetchall()
+            hourly = conn.execute("SELECT hour, fires FROM hourly_fires WHERE hour >= ? ORDER BY hour DESC", (since,)).fetchall()
+        finally:
+            conn.close()
+        return {
+            "total": counters.get("total", 0),
+            "active_users": counters.get("active_users", 0),
+            "fires": counters.get("fires", 0),
+            "types": {name[5:]: value for name, value in counters.items() if name.startswith("type:") and value > 0},
+            "top_chats": top_chats,
+            "hourly_fires": hourly,
+        }
+
+    def _pending(self, sql: str, key: str) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(sql, (key,)).fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
+    def _record(self, wxid: str, rows: Iterable[Tuple[str, str]], sign: int):
+        rows = list(rows)
+        if not rows:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self._apply(conn, wxid, rows, sign)
+        except sqlite3.Error as e:
+            logger.error(f"更新提醒统计失败: {e}")
+        finally:
+            conn.close()
+
+    def _apply(self, conn: sqlite3.Connection, wxid: str, rows: list, sign: int):
+        with conn:
+            delta = sign * len(rows)
+            self._add_counter(conn, "total", delta)
+            for reminder_type, count in Counter(reminder_type for reminder_type, _ in rows).items():
+                self._add_counter(conn, f"type:{reminder_type}", sign * count)
+            for chat_id, count in Counter(chat_id for _, chat_id in rows).items():
+                self._add_pending(conn, "chat_counts", "chat_id", chat_id, sign * count)
+
+            before = self._add_pending(conn, "user_counts", "wxid", wxid, delta)
+            after = max(before + delta, 0)
+            if before == 0 and after > 0:
+                self._add_counter(conn, "active_users", 1)
+            elif before > 0 and after == 0:
+                self._add_counter(conn, "active_users", -1)
+
+    @staticmethod
+    def _add_counter(conn: sqlite3.Connection, name: str, delta: int):
+        conn.execute("INSERT INTO counters (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = MAX(value + excluded.value, 0)",
+                     (name, delta))
+
+    @staticmethod
+    def _add_pending(conn: sqlite3.Connection, table: str, column: str, key: str, delta: int) -> int:
+        """更新计数并返回更新前的值，计数归零的行直接删除"""
+        row = conn.execute(f"SELECT pending FROM {table} WHERE {column} = ?", (key,)).fetchone()
+        before = row[0] if row else 0
+        after = before + delta
+        if after > 0:
+            conn.execute(f"INSERT OR REPLACE INTO {table} ({column}, pending) VALUES (?, ?)", (key, after))
+        elif row:
+            conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (key,))
+        return before